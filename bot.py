@@ -68,6 +68,20 @@ user_states = {}
 temp_plant_data = {}
 temp_booking_data = {}
 
+# Кэш заказов в памяти (копия bookings.json после последнего успешного сохранения)
+bookings_cache = {}
+# Индекс заказов: user_id -> список номеров бронирований этого пользователя
+user_bookings_index = {}
+
+# Статусы заказов: статус -> (эмодзи, описание)
+BOOKING_STATUSES = {
+    'pending': ('⏳', 'В обработке'),
+    'cancelled': ('❌', 'Отменён')
+}
+
+# Сколько последних заказов показывать клиенту (ограничение длины сообщения и клавиатуры)
+MY_ORDERS_LIMIT = 10
+
 def load_json_file(filename):
     """Загрузка данных из JSON файла с обработкой ошибок"""
     try:
@@ -81,12 +95,20 @@ def load_json_file(filename):
 
 def save_json_file(filename, data):
     """Сохранение данных в JSON файл с обработкой ошибок"""
+    tmp_filename = f"{filename}.tmp"
     try:
-        with open(filename, 'w', encoding='utf-8') as file:
+        # Пишем во временный файл и атомарно подменяем, чтобы не оставить файл обрезанным
+        with open(tmp_filename, 'w', encoding='utf-8') as file:
             json.dump(data, file, ensure_ascii=False, indent=2)
+        os.replace(tmp_filename, filename)
         return True
     except Exception as e:
         logger.error(f"Ошибка сохранения файла {filename}: {e}")
+        try:
+            if os.path.exists(tmp_filename):
+                os.remove(tmp_filename)
+        except OSError as remove_error:
+            logger.error(f"Ошибка удаления временного файла {tmp_filename}: {remove_error}")
         return False
 
 def load_plants():
@@ -102,8 +124,34 @@ def load_bookings():
     return load_json_file('bookings.json')
 
 def save_bookings(bookings):
-    """Сохранение списка бронирований"""
-    return save_json_file('bookings.json', bookings)
+    """Сохранение списка бронирований с обновлением кэша"""
+    if not save_json_file('bookings.json', bookings):
+        return False
+    bookings_cache.clear()
+    bookings_cache.update(bookings)
+    return True
+
+def index_booking(booking_id, user_id):
+    """Добавление бронирования в индекс заказов пользователя"""
+    booking_ids = user_bookings_index.setdefault(user_id, [])
+    if booking_id not in booking_ids:
+        booking_ids.append(booking_id)
+
+def init_bookings_cache():
+    """Загрузка кэша заказов и построение индекса при запуске"""
+    bookings_cache.clear()
+    bookings_cache.update(load_bookings())
+    user_bookings_index.clear()
+    for booking_id, booking in bookings_cache.items():
+        user_id = booking.get('user_id')
+        if user_id is not None:
+            index_booking(booking_id, user_id)
+    logger.info(f"Загружено заказов: {len(bookings_cache)}, клиентов: {len(user_bookings_index)}")
+
+def get_booking_status(booking):
+    """Эмодзи и описание статуса заказа"""
+    status = booking.get('status', 'pending')
+    return BOOKING_STATUSES.get(status, ('❔', status))
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Обработчик команды /start"""
@@ -124,7 +172,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     if is_admin:
         keyboard = [
-            [KeyboardButton("📱 Каталог растений")],
+            [KeyboardButton("📱 Каталог растений"), KeyboardButton("🧾 Мои заказы")],
             [KeyboardButton("➕ Добавить растение"), KeyboardButton("❌ Удалить растение")],
             [KeyboardButton("📋 Управление заказами")],
             [KeyboardButton("🔧 Debug Info")]
@@ -132,7 +180,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.info(f"✅ Показываем АДМИНСКУЮ клавиатуру для пользователя {user_id}")
     else:
         keyboard = [
-            [KeyboardButton("📱 Каталог растений")],
+            [KeyboardButton("📱 Каталог растений"), KeyboardButton("🧾 Мои заказы")],
             [KeyboardButton("ℹ️ Проверить права")]
         ]
         logger.info(f"👤 Показываем обычную клавиатуру для пользователя {user_id}")
@@ -449,6 +497,8 @@ async def handle_booking_phone(update: Update, context: ContextTypes.DEFAULT_TYP
     bookings[booking_id] = booking_data
     
     if save_bookings(bookings):
+        index_booking(booking_id, user_id)
+        
         plants = load_plants()
         plant_id = booking_data['plant_id']
         if plant_id in plants:
@@ -484,6 +534,100 @@ async def handle_booking_phone(update: Update, context: ContextTypes.DEFAULT_TYP
     else:
         await update.message.reply_text("❌ Ошибка при сохранении бронирования. Попробуйте позже.")
 
+def build_my_orders_view(user_id):
+    """Формирование списка заказов пользователя по индексу"""
+    booking_ids = user_bookings_index.get(user_id)
+    if not booking_ids:
+        return "🧾 У вас пока нет заказов.", None
+    
+    recent_ids = booking_ids[-MY_ORDERS_LIMIT:]
+    
+    message_text = "🧾 Ваши заказы:\n\n"
+    if len(booking_ids) > MY_ORDERS_LIMIT:
+        message_text = f"🧾 Ваши последние {MY_ORDERS_LIMIT} из {len(booking_ids)} заказов:\n\n"
+    
+    keyboard = []
+    for booking_id in reversed(recent_ids):
+        booking = bookings_cache.get(booking_id)
+        if not booking:
+            continue
+        status_emoji, status_text = get_booking_status(booking)
+        message_text += (
+            f"🆔 #{booking_id}: {booking['plant_name']} - {booking['price']}₽\n"
+            f"   {status_emoji} {status_text}\n"
+        )
+        if booking.get('status') == 'pending':
+            keyboard.append([InlineKeyboardButton(f"🚫 Отменить заказ #{booking_id}", callback_data=f"cancel_{booking_id}")])
+    
+    reply_markup = InlineKeyboardMarkup(keyboard) if keyboard else None
+    return message_text, reply_markup
+
+async def show_my_orders(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Показ заказов пользователя"""
+    user_id = update.effective_user.id
+    message_text, reply_markup = build_my_orders_view(user_id)
+    await update.message.reply_text(message_text, reply_markup=reply_markup)
+
+async def cancel_booking(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Отмена заказа клиентом с возвратом растения на склад"""
+    query = update.callback_query
+    user_id = update.effective_user.id
+    booking_id = query.data.split('_')[1]
+    
+    if booking_id not in user_bookings_index.get(user_id, []):
+        await query.answer("❌ Заказ не найден!")
+        return
+    
+    # Между чтением и записью нет await, поэтому другой обработчик не вклинится
+    bookings = load_bookings()
+    booking = bookings.get(booking_id)
+    
+    if not booking or booking.get('user_id') != user_id:
+        await query.answer("❌ Заказ не найден!")
+        return
+    
+    if booking.get('status') != 'pending':
+        await query.answer("❌ Этот заказ уже нельзя отменить.")
+        return
+    
+    # Отменённый заказ - новая запись, исходная нужна для отката и не должна меняться в кэше
+    bookings[booking_id] = dict(booking, status='cancelled', cancel_time=datetime.now().isoformat())
+    
+    if not save_bookings(bookings):
+        await query.answer("❌ Ошибка при отмене заказа. Попробуйте позже.")
+        return
+    
+    plants = load_plants()
+    plant_id = booking['plant_id']
+    if plant_id in plants:
+        plants[plant_id]['quantity'] += 1
+        if not save_plants(plants):
+            # Склад не обновился - возвращаем заказ в исходное состояние
+            logger.error(f"Не удалось вернуть на склад растение {plant_id} по заказу #{booking_id}, откат отмены")
+            bookings[booking_id] = booking
+            if not save_bookings(bookings):
+                logger.error(f"Не удалось откатить отмену заказа #{booking_id}: заказ отменён без возврата на склад")
+            await query.answer("❌ Ошибка при отмене заказа. Попробуйте позже.")
+            return
+    
+    await query.answer("✅ Заказ отменён")
+    
+    message_text, reply_markup = build_my_orders_view(user_id)
+    await query.edit_message_text(message_text, reply_markup=reply_markup)
+    
+    # Уведомление админов
+    for admin_id in ADMIN_IDS:
+        try:
+            await context.bot.send_message(
+                chat_id=admin_id,
+                text=f"🚫 Клиент отменил заказ!\n\n"
+                     f"🆔 Заказ #{booking_id}\n"
+                     f"👤 Клиент: {booking['customer_name']}\n"
+                     f"🌸 Растение: {booking['plant_name']}"
+            )
+        except Exception as e:
+            logger.error(f"Ошибка отправки уведомления админу {admin_id}: {e}")
+
 async def check_rights(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Проверка прав пользователя"""
     user_id = update.effective_user.id
@@ -538,6 +682,7 @@ async def debug_info(update: Update, context: ContextTypes.DEFAULT_TYPE):
 **🌸 База данных:**
 • Растений: {len(plants)}
 • Заказов: {len(bookings)}
+• Клиентов с заказами: {len(user_bookings_index)}
 • Активных состояний: {len(user_states)}
 
 **👥 Пользователи:**
@@ -587,6 +732,8 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
     # Обработка команд через кнопки
     if text == "📱 Каталог растений":
         await show_catalog(update, context)
+    elif text == "🧾 Мои заказы":
+        await show_my_orders(update, context)
     elif text == "➕ Добавить растение":
         await add_plant_start(update, context)
     elif text == "📋 Управление заказами":
@@ -595,7 +742,7 @@ async def handle_text_messages(update: Update, context: ContextTypes.DEFAULT_TYP
             if bookings:
                 msg = "📋 **Заказы:**\n\n"
                 for booking_id, booking in bookings.items():
-                    status_emoji = "⏳" if booking.get('status') == 'pending' else "✅"
+                    status_emoji, _ = get_booking_status(booking)
                     msg += f"{status_emoji} #{booking_id}: {booking['plant_name']} - {booking['customer_name']}\n"
                 await update.message.reply_text(msg, parse_mode='Markdown')
             else:
@@ -629,6 +776,8 @@ async def handle_callback_queries(update: Update, context: ContextTypes.DEFAULT_
         await handle_plant_selection(update, context)
     elif data.startswith("book_"):
         await start_booking(update, context)
+    elif data.startswith("cancel_"):
+        await cancel_booking(update, context)
     elif data == "back_to_catalog":
         await back_to_catalog(update, context)
     else:
@@ -642,11 +791,14 @@ def main():
     
     logger.info(f"🚀 Запуск бота с {len(ADMIN_IDS)} администраторами: {ADMIN_IDS}")
     
+    init_bookings_cache()
+    
     application = Application.builder().token(BOT_TOKEN).build()
     
     # Регистрация обработчиков
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("debug", check_rights))
+    application.add_handler(CommandHandler("myorders", show_my_orders))
     application.add_handler(CallbackQueryHandler(handle_callback_queries))
     application.add_handler(MessageHandler(filters.PHOTO, handle_photo_messages))
     application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, handle_text_messages))